@@ -34,21 +34,420 @@ It handles authentication, export request submission, status polling, and file d
 
 # Standard library imports
 import argparse
+import base64
+import binascii
+import email.utils
 import json
 import logging
 import os
+import queue
+import random
+import re
+import socket
+import sys
 import threading
 import time
-from concurrent.futures import ThreadPoolExecutor
-from typing import Any, Dict, Optional, Tuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
 
 # Third-party imports
 import urllib3
-from azure.identity import InteractiveBrowserCredential
+from urllib3.connection import HTTPConnection
+from azure.core.credentials import TokenCredential
+from azure.identity import AuthenticationRecord, InteractiveBrowserCredential, TokenCachePersistenceOptions
 
 # start of the program
 epoch = int(time.time())
 
+# logger for the trace messages, printed by the listener thread created in startTraceListener
+traceLogger = logging.getLogger("export_report.trace")
+
+# pool manager shared by all exports of the process, see getPoolManager
+poolManager: Optional[urllib3.PoolManager] = None
+
+# Power BI API host per --cluster value. You can get the host from the service in web tools.
+CLUSTER_HOSTS = {
+    "localhost": "https://onebox-redirect.analysis.windows-int.net",
+    "devbox": "https://onebox-redirect.analysis.windows-int.net",
+    "onebox": "https://onebox-redirect.analysis.windows-int.net",
+    "edog": "https://biazure-int-edog-redirect.analysis-df.windows.net",
+    "daily": "https://wabi-daily-us-east2-redirect.analysis.windows.net",
+    "dxt": "https://wabi-staging-us-east-redirect.analysis.windows.net",
+    "msit": "https://df-msit-scus-redirect.analysis.windows.net",
+    "prod": "https://api.powerbi.com",
+}
+
+# account that signed in interactively, remembered with --persistTokenCache so that later runs can skip the browser
+AUTH_RECORD_PATH = os.path.join(os.path.expanduser("~"), ".export_report_auth_record.json")
+
+# TCP keep-alive, on top of urllib3's TCP_NODELAY, so that the connections idling between two polls stay open
+SOCKET_OPTIONS = HTTPConnection.default_socket_options + [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+if hasattr(socket, "TCP_KEEPIDLE"):
+    SOCKET_OPTIONS.append((socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 30))
+
+# a connection that stops responding fails the request instead of blocking its worker forever
+REQUEST_TIMEOUT = urllib3.Timeout(connect=10, read=120)
+
+# Retries of transient failures of the status polls and downloads, which are idempotent. The pool manager itself does
+# not retry, so that a lost response to an ExportTo request can never create a duplicate export job.
+# Retry-After is not honored here: a throttled response must reach requestWithRetry, which shares the back-off
+# with the other exports and waits interruptibly.
+GET_RETRIES = urllib3.Retry(
+    total=3,
+    backoff_factor=0.5,
+    status_forcelist=[502, 503, 504],
+    raise_on_status=False,
+    respect_retry_after_header=False,
+)
+
+# upper bound on a Retry-After of a status poll, so that a bogus header cannot park an export for hours
+MAX_POLL_RETRY_AFTER = 300
+
+# maximum number of bytes of a response body printed in a trace message, so that an error page cannot flood the output
+TRACED_BODY_SIZE = 1024
+
+# number of bytes read from the download stream per iteration, and written to disk in a single write
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+# maximum number of downloaded chunks waiting to be written to disk
+DOWNLOAD_QUEUE_SIZE = 8
+
+
+def getPoolManager(maxsize: int) -> urllib3.PoolManager:
+    """
+    Get the pool manager shared by all exports of the process.
+
+    The pool manager outlives a single run of main(), so that its kept-alive connections are reused when the
+    exports are driven repeatedly from the same process. It is only replaced when a bigger pool is needed.
+
+    Args:
+        maxsize (int): The minimum number of connections to keep alive per host.
+
+    Returns:
+        urllib3.PoolManager: The shared pool manager.
+    """
+    global poolManager
+    if poolManager is None or poolManager.connection_pool_kw["maxsize"] < maxsize:
+        if poolManager is not None:
+            # close the kept-alive connections of the smaller pools, which nothing will use again
+            poolManager.clear()
+        poolManager = urllib3.PoolManager(
+            maxsize=maxsize, block=False, retries=False, timeout=REQUEST_TIMEOUT, socket_options=SOCKET_OPTIONS
+        )
+    return poolManager
+
+
+def logPoolStats() -> None:
+    """
+    Log the number of connections opened per host against the number of requests sent, to check the keep-alive reuse.
+    """
+    if poolManager is None:
+        return
+
+    for key in poolManager.pools.keys():
+        pool = poolManager.pools.get(key)
+        if pool is not None:
+            logging.debug(
+                "%s://%s:%s: %d requests over %d connections",
+                key.key_scheme,
+                key.key_host,
+                key.key_port,
+                pool.num_requests,
+                pool.num_connections,
+            )
+
+
+class TraceFormatter(logging.Formatter):
+    """Formatter for the trace messages of the export contexts."""
+
+    def __init__(self):
+        super().__init__(
+            fmt=(
+                "[%(delta)ds] [%(asctime)s.%(msecs)03d] [Thr:%(thread)d] [%(exportNumber)s:%(phase)s] "
+                "[RAID:%(requestId)s] %(message)s"
+            ),
+            datefmt="%Y-%m-%d %H:%M:%S",
+        )
+        # the date only has a second resolution, the milliseconds are added by the format, so the last date
+        # formatted is reused within the same second
+        self.lastSecond: Optional[int] = None
+        self.lastTime = ""
+
+    def format(self, record: logging.LogRecord) -> str:
+        record.delta = int(record.created) - epoch
+        return super().format(record)
+
+    def formatTime(self, record: logging.LogRecord, datefmt: Optional[str] = None) -> str:
+        second = int(record.created)
+        if second != self.lastSecond:
+            self.lastSecond = second
+            self.lastTime = super().formatTime(record, datefmt)
+        return self.lastTime
+
+
+class TraceStreamHandler(logging.StreamHandler):
+    """
+    Stream handler used by the trace listener thread, which only flushes once the queue has been drained.
+
+    A burst of trace messages is then written to stdout in one go instead of one write per message.
+    """
+
+    def __init__(self, stream: Any, traceQueue: "queue.SimpleQueue[logging.LogRecord]"):
+        super().__init__(stream)
+        self.traceQueue = traceQueue
+
+    def flush(self) -> None:
+        if self.traceQueue.empty():
+            super().flush()
+
+
+def startTraceListener() -> QueueListener:
+    """
+    Route the trace messages through a queue to a background thread, which formats and prints them.
+
+    This keeps the formatting and the stdout lock off the worker threads.
+
+    Returns:
+        QueueListener: The started listener, which must be passed to stopTraceListener at the end of the run.
+    """
+    traceQueue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    handler = TraceStreamHandler(sys.stdout, traceQueue)
+    handler.setFormatter(TraceFormatter())
+
+    traceLogger.addHandler(QueueHandler(traceQueue))
+    traceLogger.setLevel(logging.INFO)
+    traceLogger.propagate = False
+
+    listener = QueueListener(traceQueue, handler)
+    listener.start()
+    return listener
+
+
+def stopTraceListener(listener: QueueListener) -> None:
+    """
+    Detach the queue of a trace listener from the trace logger, then print the messages still in the queue.
+
+    Args:
+        listener (QueueListener): The listener returned by startTraceListener.
+    """
+    # the next run of main() adds its own queue handler, so this one must not keep filling a queue nobody drains
+    for handler in list(traceLogger.handlers):
+        if isinstance(handler, QueueHandler) and handler.queue is listener.queue:
+            traceLogger.removeHandler(handler)
+
+    listener.stop()
+    sys.stdout.flush()
+
+
+def createInteractiveCredential(scope: str, persistTokenCache: bool) -> InteractiveBrowserCredential:
+    """
+    Create the credential for the interactive browser login.
+
+    With persistTokenCache, the tokens are kept in the encrypted token cache of the operating system and the
+    signed in account in AUTH_RECORD_PATH, so that the next runs get their token silently instead of opening a browser.
+
+    Args:
+        scope (str): The scope to sign in for, when no account has been remembered yet.
+        persistTokenCache (bool): Flag indicating whether to persist the tokens across runs.
+
+    Returns:
+        InteractiveBrowserCredential: The credential.
+    """
+    if not persistTokenCache:
+        return InteractiveBrowserCredential()
+
+    authRecord = None
+    if os.path.exists(AUTH_RECORD_PATH):
+        with open(AUTH_RECORD_PATH, "r") as file:
+            authRecord = AuthenticationRecord.deserialize(file.read())
+
+    credential = InteractiveBrowserCredential(
+        cache_persistence_options=TokenCachePersistenceOptions(name="export_report"), authentication_record=authRecord
+    )
+
+    if authRecord is None:
+        # the silent token lookup needs to know the account, so sign in once and remember it
+        authRecord = credential.authenticate(scopes=[scope])
+        with open(AUTH_RECORD_PATH, "w") as file:
+            file.write(authRecord.serialize())
+
+    return credential
+
+
+class AccessTokenProvider:
+    """
+    Supplier of the authenticated request headers, shared by all export contexts.
+
+    A token obtained from a credential is refreshed shortly before it expires, so that runs lasting longer
+    than the token lifetime keep working. A token passed in directly (PBI_ACCESS_TOKEN) is used as is.
+    """
+
+    def __init__(
+        self,
+        scope: str,
+        credential: Optional[TokenCredential] = None,
+        accessToken: Optional[str] = None,
+        refreshMargin: int = 300,
+    ):
+        """
+        Initialize the provider and acquire the first token, if it was not passed in.
+
+        Args:
+            scope (str): The scope to request the token for.
+            credential (TokenCredential): The credential used to acquire and refresh the token.
+            accessToken (str): A fixed token to use instead of the credential.
+            refreshMargin (int): How many seconds before its expiration the token is refreshed.
+        """
+        self.scope = scope
+        self.credential = credential
+        self.refreshMargin = refreshMargin
+        self.lock = threading.Lock()
+        self.expiresOn: Optional[int] = None  # None for a fixed token, which is never refreshed
+
+        if accessToken:
+            self.setToken(accessToken, None)
+        else:
+            self.refresh()
+
+    def setToken(self, accessToken: str, expiresOn: Optional[int]) -> None:
+        """
+        Build the request headers for a new token.
+
+        Args:
+            accessToken (str): The authentication token for Power BI API access.
+            expiresOn (int): The expiration time of the token in seconds since the epoch, or None.
+        """
+        self.headers = {"Content-Type": "application/json", "Authorization": f"Bearer {accessToken}"}
+        self.expiresOn = expiresOn
+
+    def refresh(self, claims: Optional[str] = None) -> None:
+        """
+        Acquire a new token from the credential.
+
+        Args:
+            claims (str): The claims challenge of a rejected request, which makes the credential bypass its cache.
+        """
+        token = self.credential.get_token(self.scope, claims=claims)
+        if not token:
+            raise ValueError(
+                "Access token could not be obtained. Please set the PBI_ACCESS_TOKEN environment variable."
+            )
+        self.setToken(token.token, token.expires_on)
+
+    def getHeaders(self) -> Dict[str, str]:
+        """
+        Get the request headers, refreshing the token first if it is about to expire.
+
+        Returns:
+            dict: The HTTP headers to be included in API requests.
+        """
+        if self.expiresOn is not None and self.expiresOn - time.time() < self.refreshMargin:
+            with self.lock:
+                # another thread may have refreshed the token while we were waiting for the lock
+                if self.expiresOn - time.time() < self.refreshMargin:
+                    self.refresh()
+
+        return self.headers
+
+    def refreshRejected(self, rejectedHeaders: Dict[str, str], claims: Optional[str] = None) -> bool:
+        """
+        Refresh the token after the service rejected it with a 401, unless another thread already did.
+
+        Args:
+            rejectedHeaders (dict): The headers of the rejected request, as returned by getHeaders.
+            claims (str): The claims challenge from the WWW-Authenticate header of the 401, if any.
+
+        Returns:
+            bool: True if the current headers carry a different token than the rejected ones, False for a fixed
+                token or when the credential returned the rejected token again.
+        """
+        if self.credential is None:
+            return False
+
+        with self.lock:
+            # only the first of the threads rejected with the same token acquires a new one; the token is compared
+            # rather than the headers, because a refresh returning the cached token still builds new headers
+            if self.headers["Authorization"] == rejectedHeaders["Authorization"]:
+                self.refresh(claims)
+
+            # without a claims challenge the credential may serve the rejected token from its cache
+            return self.headers["Authorization"] != rejectedHeaders["Authorization"]
+
+
+class HostBackoff:
+    """
+    Back-off state shared by all export contexts.
+
+    When one export is rate limited, the requests of all the other exports are held back as well, instead of
+    each of them probing the throttled host on its own.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.notBefore = 0.0  # time before which no request should be sent
+
+    def remaining(self) -> float:
+        """
+        Get the number of seconds left before requests can be sent again.
+
+        Returns:
+            float: The remaining back-off time, 0 or negative if requests can be sent right away.
+        """
+        with self.lock:
+            return self.notBefore - time.time()
+
+    def backOff(self, delay: float) -> None:
+        """
+        Hold back all requests for the given number of seconds, unless they are already held back for longer.
+
+        Args:
+            delay (float): The number of seconds to hold back the requests.
+        """
+        with self.lock:
+            self.notBefore = max(self.notBefore, time.time() + delay)
+
+
+class TokenBucket:
+    """
+    Token bucket pacing the start of the exports, shared by all export contexts.
+
+    The Power BI export API throttles bursts of export jobs, so with --rps the ExportTo requests are spread out
+    up front, rather than only backing off once the service answers with a 429.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        Initialize a full bucket.
+
+        Args:
+            rate (float): The number of tokens added per second.
+            burst (int): The maximum number of tokens the bucket holds.
+        """
+        self.rate = rate
+        self.burst = burst
+        self.lock = threading.Lock()
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def reserve(self) -> float:
+        """
+        Take a token, ahead of time if the bucket is empty.
+
+        Returns:
+            float: The number of seconds to wait before the token can be used, 0 if it can be used right away.
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            return max(-self.tokens / self.rate, 0.0)
+
+
+class ExportCancelled(Exception):
+    """Raised instead of sending a request once the run is shutting down."""
+
 
 class ExportContext:
     """
@@ -63,13 +462,17 @@ class ExportContext:
         self,
         exportNumber: int,
         http: urllib3.PoolManager,
-        accessToken: str,
+        backoff: HostBackoff,
+        shutdown: threading.Event,
+        startBucket: Optional[TokenBucket],
+        tokenProvider: AccessTokenProvider,
         workspaceId: Optional[str],
         reportId: str,
         host: str,
-        headers: Dict[str, str],
         exportRequest: Dict[str, Any],
+        exportRequestBody: bytes,
         discardDownload: bool,
+        failFast: bool,
     ):
         """
         Initialize the export context with the provided parameters.
@@ -77,41 +480,55 @@ class ExportContext:
         Args:
             exportNumber (int): The number of the export operation.
             http (urllib3.PoolManager): The HTTP client instance.
-            accessToken (str): The authentication token for Power BI API access.
+            backoff (HostBackoff): The back-off state shared with the other export contexts.
+            shutdown (Event): Set when the run is shutting down, to cut the pending waits short.
+            startBucket (TokenBucket): The pacing of the export starts shared with the other contexts, or None.
+            tokenProvider (AccessTokenProvider): The supplier of the authenticated HTTP headers.
             workspaceId (str): The ID of the Power BI workspace.
             reportId (str): The ID of the report to be exported.
             host (str): The Power BI API host URL.
-            headers (dict): HTTP headers to be included in API requests.
             exportRequest (dict): The export configuration parameters.
+            exportRequestBody (bytes): The JSON-encoded export request, shared by all contexts.
             discardDownload (bool): Flag indicating whether to discard the downloaded export result.
+            failFast (bool): Flag indicating whether a failed export shuts down the whole run.
         """
         self.exportNumber = exportNumber
         self.http = http
-        self.accessToken = accessToken
+        self.backoff = backoff
+        self.shutdown = shutdown
+        self.startBucket = startBucket
+        self.tokenProvider = tokenProvider
         self.workspaceId = workspaceId
         self.reportId = reportId
         self.host = host
-        self.headers = headers
         self.exportRequest = exportRequest
+        self.exportRequestBody = exportRequestBody
         self.groupPath = f"groups/{workspaceId}/" if workspaceId else ""
+        self.createUrl = f"{host}/v1.0/myorg/{self.groupPath}reports/{reportId}/ExportTo"
+        self.exportsUrl = f"{host}/v1.0/myorg/{self.groupPath}reports/{reportId}/exports/"
         self.discardDownload = discardDownload
+        self.failFast = failFast
         self.phase = "init"
         self.requestId = None  # Will be set from response headers
 
+    @property
+    def headers(self) -> Dict[str, str]:
+        """
+        The HTTP headers to be included in API requests, carrying a valid access token.
+        """
+        return self.tokenProvider.getHeaders()
+
     def trace(self, msg: str):
         """
-        Print a message with the seconds after the program start, the timestamp, thread ID, and request ID.
+        Log a message with the seconds after the program start, the timestamp, thread ID, and request ID.
+
+        The message is only queued here; it is formatted and printed by the trace listener thread.
 
         Args:
             msg (str): The message to print.
         """
-        t = time.time()
-        now = int(t)  # Unfortunately this is only at the second level.
-        delta = now - epoch
-        strTime = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(t))
-        threadId = threading.current_thread().ident
-        print(
-            f"[{delta}s] [{strTime}] [Thr:{threadId}] [{self.exportNumber}:{self.phase}] [RAID:{self.requestId}] {msg}"
+        traceLogger.info(
+            msg, extra={"exportNumber": self.exportNumber, "phase": self.phase, "requestId": self.requestId}
         )
 
     def setRequestId(self, response: urllib3.HTTPResponse) -> None:
@@ -126,16 +543,40 @@ class ExportContext:
     def requestWithRetry(
         self, httpMethod: str, url: str, maxInterval: int = 16, baseInterval: int = 1, **request_kwargs: Any
     ) -> urllib3.HTTPResponse:
-        """Issue an HTTP request with automatic 429/back-off handling."""
+        """Issue an HTTP request with automatic 429/back-off handling, and a single retry on 401 with a new token."""
 
         delay = baseInterval
+        tokenRefreshed = False
 
         while True:
+            if self.shutdown.is_set():
+                raise ExportCancelled("The run is shutting down")
+
+            # hold back while the host is throttling us, whichever export got the 429
+            waitSeconds = self.backoff.remaining()
+            if waitSeconds > 0:
+                # jitter, so that the held back exports do not all send their requests at the same time
+                waitSeconds += random.uniform(0, 0.5 * waitSeconds)
+                self.trace(f"Sleeping {waitSeconds:.1f} seconds before sending the request…")
+                if self.shutdown.wait(waitSeconds):
+                    raise ExportCancelled("The run is shutting down")
+
             response = self.http.request(httpMethod, url, **request_kwargs)
             self.setRequestId(response)
 
+            if response.status == 401 and not tokenRefreshed:
+                # the token can be revoked or expire early, so retry once with a new one
+                rejectedHeaders = request_kwargs.get("headers")
+                claims = parseClaimsChallenge(response.headers.get("WWW-Authenticate"))
+                if rejectedHeaders is not None and self.tokenProvider.refreshRejected(rejectedHeaders, claims):
+                    self.trace(f"Unauthorized (status 401) on {url}, retrying with a refreshed access token")
+                    response.release_conn()
+                    request_kwargs["headers"] = self.headers
+                    tokenRefreshed = True
+                    continue
+
             if response.status != 429:
-                return response  # caller must close/release via ResponseContextManager
+                return response  # caller must release the connection of a streamed response
 
             self.trace(f"Rate limited (status 429) on {url}")
 
@@ -144,33 +585,90 @@ class ExportContext:
             # release connection before looping again.
             response.release_conn()
 
-            if retry_after:
-                try:
-                    delay = int(retry_after)
-                    self.trace(f"Sleeping {delay} seconds per Retry-After header")
-                except ValueError:
-                    self.trace(f"Ignoring invalid Retry-After value '{retry_after}'")
+            # wait at least as long as the server asks, but keep backing off exponentially on repeated 429s
+            serverDelay = parseRetryAfter(retry_after)
+            if serverDelay is not None:
+                serverDelay = min(serverDelay, maxInterval * 4)
+                self.trace(f"Retry-After header asks for {serverDelay:.1f} seconds")
+            elif retry_after:
+                self.trace(f"Ignoring invalid Retry-After value '{retry_after}'")
+
+            # the wait itself happens at the top of the loop, together with the other exports
+            self.backoff.backOff(max(delay, serverDelay or 0))
+            delay = min(delay * 2, maxInterval)
+
+
+def parseRetryAfter(retryAfter: Optional[str]) -> Optional[float]:
+    """
+    Parse the value of a Retry-After header, which can be either a number of seconds or an HTTP-date.
+
+    Args:
+        retryAfter (str): The raw header value, or None if the header was not present.
+
+    Returns:
+        float or None: The number of seconds to wait, or None if the value is missing or invalid.
+    """
+    if not retryAfter:
+        return None
+
+    try:
+        return float(max(int(retryAfter), 0))
+    except ValueError:
+        pass
 
-            if delay:
-                self.trace(f"Sleeping {delay} seconds before retrying…")
-                time.sleep(delay)
+    try:
+        retryAt = email.utils.parsedate_to_datetime(retryAfter)
+    except (TypeError, ValueError):
+        return None
 
-            if retry_after is None and delay < maxInterval:
-                delay = min(delay * 2, maxInterval)
+    return max(retryAt.timestamp() - time.time(), 0.0)
 
 
-class ResponseContextManager:
-    """Context manager for urllib3 response objects."""
+def parseClaimsChallenge(wwwAuthenticate: Optional[str]) -> Optional[str]:
+    """
+    Extract the claims challenge from the WWW-Authenticate header of a 401 response.
 
-    def __init__(self, response: urllib3.HTTPResponse):
-        self.response = response
+    Args:
+        wwwAuthenticate (str): The raw header value, or None if the header was not present.
 
-    def __enter__(self) -> urllib3.HTTPResponse:
-        return self.response
+    Returns:
+        str or None: The decoded claims, or None if the header carries no valid claims challenge.
+    """
+    match = re.search(r'claims="([^"]+)"', wwwAuthenticate or "")
+    if not match:
+        return None
 
-    def __exit__(self, exc_type: Optional[type], exc_val: Optional[Exception], exc_tb: Optional[Any]) -> None:
-        if hasattr(self.response, "release_conn"):
-            self.response.release_conn()
+    encoded = match.group(1)
+    try:
+        # the challenge is base64url encoded, usually without padding
+        return base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4)).decode("utf-8") or None
+    except (binascii.Error, UnicodeDecodeError):
+        return None
+
+
+def bodyForTrace(response: urllib3.HTTPResponse) -> str:
+    """
+    Decode the start of a response body for a trace message.
+
+    Args:
+        response (HTTPResponse): The HTTP response.
+
+    Returns:
+        str: At most TRACED_BODY_SIZE bytes of the body, decoded as UTF-8.
+    """
+    return response.data[:TRACED_BODY_SIZE].decode("utf-8", errors="replace")
+
+
+def stopRunOnFailure(context: ExportContext) -> None:
+    """
+    Shut down the other exports after this one failed, if the run was started with --failFast.
+
+    Args:
+        context (ExportContext): The context of the failed export.
+    """
+    if context.failFast and not context.shutdown.is_set():
+        context.trace("Shutting down the other exports (--failFast)")
+        context.shutdown.set()
 
 
 def startExport(context: ExportContext) -> Optional[str]:
@@ -183,131 +681,292 @@ def startExport(context: ExportContext) -> Optional[str]:
     Returns:
         str or None: The export ID if successful, None otherwise.
     """
+    if context.shutdown.is_set():
+        # queued before the run started shutting down, so there is nothing to trace
+        return None
+
     context.phase = "start"
-    createUrl = f"{context.host}/v1.0/myorg/{context.groupPath}reports/{context.reportId}/ExportTo"
+    createUrl = context.createUrl
     try:
+        if context.startBucket is not None:
+            waitSeconds = context.startBucket.reserve()
+            if waitSeconds > 0:
+                context.trace(f"Sleeping {waitSeconds:.1f} seconds to stay under the --rps limit…")
+                if context.shutdown.wait(waitSeconds):
+                    raise ExportCancelled("The run is shutting down")
+
         context.trace(f"Export started at {time.strftime('%Y-%m-%d %H:%M:%S')} for {createUrl}")
 
-        with ResponseContextManager(
-            context.requestWithRetry(
-                httpMethod="POST", url=createUrl, headers=context.headers, body=json.dumps(context.exportRequest)
-            )
-        ) as response:
-            if response.status == 202:
-                exportId = response.json().get("id")
-                context.trace(f"Export id: {exportId} started successfully")
-                return exportId
-            else:
-                context.trace(f"Failed to start export. Status code: {response.status}")
-                context.trace(f"Response: {response.data.decode('utf-8')}")
-                return None
+        # the body is preloaded, so the connection is already back in the pool
+        response = context.requestWithRetry(
+            httpMethod="POST", url=createUrl, headers=context.headers, body=context.exportRequestBody
+        )
+        if response.status == 202:
+            exportId = json.loads(response.data).get("id")
+            context.trace(f"Export id: {exportId} started successfully")
+            return exportId
+        else:
+            body = bodyForTrace(response)
+            context.trace(f"Failed to start export. Status code: {response.status}, response: {body}")
+            stopRunOnFailure(context)
+            return None
+
+    except ExportCancelled:
+        context.trace("Not started, the run is shutting down")
+        return None
 
     except Exception as e:
         context.trace(f"An error occurred: {e}")
+        stopRunOnFailure(context)
         return None
 
 
-def pollExportStatus(context: ExportContext, exportId: str) -> Tuple[str, urllib3.HTTPResponse]:
+def pollExportStatus(
+    context: ExportContext, exportId: str, maxInterval: float = 30, baseInterval: float = 1
+) -> Tuple[str, Optional[str]]:
     """
     Poll the status of an export job until it completes or fails.
 
+    The poll interval grows exponentially, with decorrelated jitter, while the export status stays the same, is reset
+    whenever the status changes, and is clamped to a quarter of the remaining time estimated from the percentComplete
+    velocity.
+    A Retry-After header on the status response, in seconds or as an HTTP-date, can only lengthen the computed
+    interval, up to MAX_POLL_RETRY_AFTER seconds.
+
     Args:
         context (ExportContext): The context containing export configuration.
         exportId (str): The ID of the export job to poll.
+        maxInterval (float): The maximum number of seconds to wait between two polls.
+        baseInterval (float): The initial and minimum number of seconds to wait between two polls.
 
     Returns:
-        tuple: (status, response) where status is "Succeeded" or "Failed" and response is the HTTP response.
+        tuple: (status, resourceLocation) where status is "Succeeded", "Failed" or "Cancelled", and resourceLocation
+            the URL of the exported file once the export succeeded.
     """
     context.phase = "poll"
-    statusUrl = f"{context.host}/v1.0/myorg/{context.groupPath}reports/{context.reportId}/exports/{exportId}"
+    statusUrl = context.exportsUrl + exportId
     status = None
+    resourceLocation = None
     response = None
-    pollIntervalSeconds = 1
+    pollIntervalSeconds = baseInterval
+    # progress seen at the previous poll, to estimate how fast the export is progressing
+    lastPctComplete = 0
+    lastPollTime = time.time()
 
     while status != "Succeeded" and status != "Failed":
         try:
             context.trace(f"Polling export status for {statusUrl}")
 
-            with ResponseContextManager(
-                context.requestWithRetry(httpMethod="GET", url=statusUrl, headers=context.headers)
-            ) as response:
-
-                if response.status in [200, 202]:
-                    rjson = response.json()
-                    status = rjson.get("status")
-                    pctComplete = rjson.get("percentComplete")
-                    context.trace(f"Export status: {status} ({pctComplete}%)")
-                else:
-                    context.trace(f"Failed to get export status. Status code: {response.status}, url: {statusUrl}")
-                    context.trace(f"Response: {response.data.decode('utf-8')}")
-                    return "Failed", response
+            response = context.requestWithRetry(
+                httpMethod="GET", url=statusUrl, headers=context.headers, retries=GET_RETRIES
+            )
 
-                if pctComplete is None or pctComplete < 100 or status == "Running":
-                    context.trace(f"Sleeping {pollIntervalSeconds} seconds...")
-                    time.sleep(pollIntervalSeconds)
+            if response.status in [200, 202]:
+                rjson = json.loads(response.data)
+                previousStatus = status
+                status = rjson.get("status")
+                pctComplete = rjson.get("percentComplete")
+                resourceLocation = rjson.get("resourceLocation")
+                context.trace(f"Export status: {status} ({pctComplete}%)")
+            else:
+                context.trace(
+                    f"Failed to get export status. Status code: {response.status}, url: {statusUrl}, "
+                    f"response: {bodyForTrace(response)}"
+                )
+                return "Failed", None
+
+            if pctComplete is None or pctComplete < 100 or status == "Running":
+                if status != previousStatus:
+                    pollIntervalSeconds = baseInterval
+
+                sleepSeconds = pollIntervalSeconds
+                now = time.time()
+                if pctComplete and pctComplete > lastPctComplete and now > lastPollTime:
+                    # estimated remaining time, assuming the export keeps progressing as fast as since the last poll
+                    velocity = (pctComplete - lastPctComplete) / (now - lastPollTime)
+                    eta = (100 - pctComplete) / velocity
+                    sleepSeconds = max(min(sleepSeconds, eta / 4), baseInterval)
+                    lastPctComplete = pctComplete
+                    lastPollTime = now
+
+                retryAfter = parseRetryAfter(response.headers.get("Retry-After"))
+                if retryAfter is not None:
+                    sleepSeconds = min(max(retryAfter, sleepSeconds), MAX_POLL_RETRY_AFTER)
+
+                context.trace(f"Sleeping {sleepSeconds:.1f} seconds...")
+                if context.shutdown.wait(sleepSeconds):
+                    context.trace("Stopped polling, the run is shutting down")
+                    return "Cancelled", None
+                # decorrelated jitter: 1.5x on average, but exports started together do not keep polling in lockstep
+                pollIntervalSeconds = min(random.uniform(baseInterval, pollIntervalSeconds * 3), maxInterval)
+
+        except ExportCancelled:
+            context.trace("Stopped polling, the run is shutting down")
+            return "Cancelled", None
 
         except Exception as e:
-            context.trace(f"An error occurred: {e}, {response.data.decode('utf-8') if response else ''}")
-            return "Failed", response
+            context.trace(f"An error occurred: {e}, {bodyForTrace(response) if response else ''}")
+            return "Failed", None
 
     if status == "Failed":
-        context.trace(f"Export failed: {response.data.decode('utf-8')}")
+        context.trace(f"Export failed: {bodyForTrace(response)}")
 
-    return status, response
+    return status, resourceLocation
 
 
-def downloadFile(context: ExportContext, response: urllib3.HTTPResponse, exportId: str) -> None:
+def writeQueuedChunks(file: BinaryIO, chunks: "queue.Queue[Optional[bytes]]", writeErrors: List[Exception]) -> None:
+    """
+    Write the chunks put in the queue to a file, until a None sentinel is received.
+
+    After a failed write, the remaining chunks are drained without being written, so that the producer
+    never blocks on a full queue.
+
+    Args:
+        file (BinaryIO): The file to write to.
+        chunks (Queue): The queue the downloaded chunks are put in.
+        writeErrors (list): Receives the exception raised by a failed write.
+    """
+    while True:
+        chunk = chunks.get()
+        if chunk is None:
+            return
+
+        if not writeErrors:
+            try:
+                file.write(chunk)
+            except Exception as e:
+                writeErrors.append(e)
+
+
+def downloadFile(context: ExportContext, downloadUrl: str, exportId: str) -> bool:
     """
     Download the exported file if the export was successful.
 
     Args:
         context (ExportContext): The context containing export configuration.
-        response (HTTPResponse): The HTTP response from the status polling.
+        downloadUrl (str): The resourceLocation of the succeeded export, as returned by pollExportStatus.
         exportId (str): The ID of the export job.
+
+    Returns:
+        bool: True if the file was downloaded, False otherwise.
     """
     context.phase = "download"
-    downloadUrl = response.json().get("resourceLocation")
-    context.setRequestId(response)
     context.trace(f"Download URL: {downloadUrl}")
 
     try:
         start_time = time.time()
 
-        with ResponseContextManager(
-            context.requestWithRetry(httpMethod="GET", url=downloadUrl, headers=context.headers, preload_content=False)
-        ) as response:
+        # gateway errors are retried by urllib3, a 429 still comes back to requestWithRetry (see GET_RETRIES)
+        response = context.requestWithRetry(
+            httpMethod="GET", url=downloadUrl, headers=context.headers, retries=GET_RETRIES, preload_content=False
+        )
+        try:
             if response.status != 200:
-                context.trace(f"Failed to download file. Status code: {response.status}, url: {downloadUrl}")
-                context.trace(f"Response: {response.data.decode('utf-8')}")
-                return
+                context.trace(
+                    f"Failed to download file. Status code: {response.status}, url: {downloadUrl}, "
+                    f"response: {bodyForTrace(response)}"
+                )
+                return False
 
             # consume the response stream, but do not write to disk:
             if context.discardDownload:
                 context.trace(f"Downloading file to /dev/null...")
-                for chunk in response.stream(8192):
-                    pass
+
+                # The data is thrown away, so read the raw body from the underlying http.client response
+                # into a single reused buffer, rather than decoding it and allocating a new bytes per chunk.
+                buffer = memoryview(bytearray(DOWNLOAD_CHUNK_SIZE))
+                bytesRead = 0
+                while True:
+                    count = response._fp.readinto(buffer)
+                    if not count:
+                        break
+                    bytesRead += count
 
                 end_time = time.time()
                 duration = end_time - start_time
-                context.trace(f"Downloaded file to /dev/null in {duration:.2f} seconds")
-                return
+                context.trace(f"Downloaded file to /dev/null in {duration:.2f} seconds, size: {bytesRead} bytes")
+                return True
 
             # write the response stream to a file:
-            os.makedirs("downloads", exist_ok=True)
             fileExtension = context.exportRequest.get("format", "pdf").lower()
             timestamp = time.strftime("%Y%m%d_%H%M%S")
             filename = f"downloads/export_{context.reportId}_{exportId[:20]}_{timestamp}.{fileExtension}"
-            with open(filename, "wb") as file:
-                for chunk in response.stream(8192):
-                    file.write(chunk)
+            try:
+                with open(filename, "wb") as file:
+                    # let the filesystem lay out the whole file up front when the final size is known
+                    contentLength = response.headers.get("Content-Length")
+                    if (
+                        contentLength
+                        and not response.headers.get("Content-Encoding")
+                        and hasattr(os, "posix_fallocate")
+                    ):
+                        try:
+                            if int(contentLength) > 0:
+                                os.posix_fallocate(file.fileno(), 0, int(contentLength))
+                        except (OSError, ValueError):
+                            pass  # only an optimization, e.g. not supported by the filesystem
+
+                    # the writes happen on a separate thread, so that a slow disk does not stall reading the socket
+                    chunks: "queue.Queue[Optional[bytes]]" = queue.Queue(maxsize=DOWNLOAD_QUEUE_SIZE)
+                    writeErrors: List[Exception] = []
+                    writer = threading.Thread(target=writeQueuedChunks, args=(file, chunks, writeErrors))
+                    writer.start()
+                    file_size = 0
+                    try:
+                        for chunk in response.stream(DOWNLOAD_CHUNK_SIZE):
+                            if writeErrors:
+                                break
+                            chunks.put(chunk)
+                            file_size += len(chunk)
+                    finally:
+                        chunks.put(None)
+                        writer.join()
+
+                    if writeErrors:
+                        raise writeErrors[0]
+
+                    # drop any preallocated space beyond what the server actually sent
+                    file.truncate()
+            except BaseException:
+                # a preallocated file padded with zeros would look complete, so do not leave a partial file behind
+                if os.path.exists(filename):
+                    os.remove(filename)
+                raise
 
             end_time = time.time()
             duration = end_time - start_time
-            file_size = os.path.getsize(filename)
             context.trace(f"Downloaded file to {filename} in {duration:.2f} seconds, size: {file_size} bytes")
+            return True
+        finally:
+            # the body is streamed, so the connection only goes back to the pool once we are done with it
+            response.release_conn()
+
+    except ExportCancelled:
+        context.trace("Not downloaded, the run is shutting down")
+        return False
 
     except Exception as e:
         context.trace(f"An error occurred: {e}")
+        return False
+
+
+def finishExport(context: ExportContext, exportId: str) -> None:
+    """
+    Execute the second half of the export workflow for a started export: poll status, and download the file.
+
+    Args:
+        context (ExportContext): The context containing export configuration.
+        exportId (str): The ID of the export job returned by startExport.
+    """
+    status, resourceLocation = pollExportStatus(context, exportId)
+    if status == "Succeeded" and resourceLocation:
+        # for i in range(10):
+        if downloadFile(context, resourceLocation, exportId):
+            return
+    elif status == "Cancelled":
+        return
+
+    stopRunOnFailure(context)
 
 
 def fullExport(context: ExportContext) -> None:
@@ -319,10 +978,7 @@ def fullExport(context: ExportContext) -> None:
     """
     exportId = startExport(context)
     if exportId:
-        status, response = pollExportStatus(context, exportId)
-        if status == "Succeeded" and response.status == 200:
-            # for i in range(10):
-            downloadFile(context, response, exportId)
+        finishExport(context, exportId)
 
 
 def main() -> None:
@@ -339,7 +995,7 @@ def main() -> None:
     parser.add_argument(
         "--cluster",
         type=str,
-        choices=["localhost", "devbox", "onebox", "edog", "daily", "dxt", "msit", "prod"],
+        choices=list(CLUSTER_HOSTS),
         default="prod",
         help="Cluster to use: (localhost,onebox,devbox), edog, daily, dxt, msit, prod (default: prod)",
     )
@@ -350,8 +1006,27 @@ def main() -> None:
     parser.add_argument("--discardDownload", action="store_true", help="Stream in the results but throw away the data")
     parser.add_argument("--exportRequestFile", type=str, help="Path to the export request JSON file")
     parser.add_argument("--httpDebug", action="store_true", help="Enable detailed HTTP request/response logging")
+    parser.add_argument(
+        "--startAllFirst",
+        action="store_true",
+        help="Start all exports before polling any of them, so they all run on the service at the same time",
+    )
+    parser.add_argument("--failFast", action="store_true", help="Stop the other exports as soon as one export fails")
+    parser.add_argument(
+        "--rps",
+        type=float,
+        help="Maximum number of exports started per second, to stay under the throttling limits (default: no limit)",
+    )
+    parser.add_argument(
+        "--persistTokenCache",
+        action="store_true",
+        help="Keep the interactive login in the encrypted token cache of the OS, so that later runs skip the browser",
+    )
     args = parser.parse_args()
 
+    if args.rps is not None and not args.rps > 0:  # also rejects nan
+        parser.error("--rps must be greater than 0")
+
     if args.httpDebug:
         logging.basicConfig(level=logging.DEBUG)
         urllib3_logger = logging.getLogger("urllib3.connectionpool")
@@ -366,19 +1041,18 @@ def main() -> None:
     if not reportId:
         raise ValueError("Report ID is required.")
 
+    host = CLUSTER_HOSTS[args.cluster]
+
     # PBI_ACCESS_TOKEN environment variable if defined as an environment variable will override the interactive login
+    # The credential is kept for the whole run, so that the token can be refreshed before it expires.
+    scope = "https://analysis.windows.net/powerbi/api/user_impersonation"
     accessToken = os.getenv("PBI_ACCESS_TOKEN")
-    if not accessToken:
-        app = InteractiveBrowserCredential()
-        scope = "https://analysis.windows.net/powerbi/api/user_impersonation"
-        accessToken = app.get_token(scope)
-        if not accessToken:
-            raise ValueError(
-                "Access token could not be obtained. Please set the PBI_ACCESS_TOKEN environment variable."
-            )
-        accessToken = accessToken.token
-
-    headers = {"Content-Type": "application/json", "Authorization": f"Bearer {accessToken}"}
+    if accessToken:
+        tokenProvider = AccessTokenProvider(scope, accessToken=accessToken)
+    else:
+        tokenProvider = AccessTokenProvider(
+            scope, credential=createInteractiveCredential(scope, args.persistTokenCache)
+        )
 
     # Read export request from file if provided, otherwise use default
     if args.exportRequestFile:
@@ -399,43 +1073,97 @@ def main() -> None:
             # }
         }
 
-    # You can get the host from the service in web tools
-    if args.cluster == "localhost" or args.cluster == "onebox" or args.cluster == "devbox":
-        host = "https://onebox-redirect.analysis.windows-int.net"
-    elif args.cluster == "edog":
-        host = "https://biazure-int-edog-redirect.analysis-df.windows.net"
-    elif args.cluster == "daily":
-        host = "https://wabi-daily-us-east2-redirect.analysis.windows.net"
-    elif args.cluster == "dxt":
-        host = "https://wabi-staging-us-east-redirect.analysis.windows.net"
-    elif args.cluster == "msit":
-        host = "https://df-msit-scus-redirect.analysis.windows.net"
-    elif args.cluster == "prod":
-        host = "https://api.powerbi.com"
-    else:
-        raise ValueError("Invalid cluster. Choose from one of: localhost, onebox, devbox, edog, daily, dxt, msit, or prod.")
-
-    # one pool manager for all threads
-    with urllib3.PoolManager(retries=False) as http:
-
-        with ThreadPoolExecutor(max_workers=concurrency) as executor:
-
-            # pump all requests into the thread pool queue
-            futures = []
-            for i in range(numExports):
-                # each request has its own context:
-                future = executor.submit(
-                    fullExport,
-                    ExportContext(
-                        i + 1, http, accessToken, workspaceId, reportId, host, headers, exportRequest, discardDownload
-                    ),
-                )
+    traceListener = startTraceListener()
+
+    try:
+        # one pool manager for all threads, sized so every worker can keep its own connection alive
+        http = getPoolManager(concurrency)
+
+        # a 429 seen by any export holds back the requests of all of them
+        backoff = HostBackoff()
 
-                futures.append(future)
+        # set on Ctrl-C or, with --failFast, on the first failed export, to stop the pending waits of all exports
+        shutdown = threading.Event()
 
-            # wait for all futures to complete
-            for future in futures:
-                future.result()
+        # with --rps, the export starts of all contexts are paced by a single bucket
+        startBucket = TokenBucket(args.rps) if args.rps else None
+
+        # created once up front, rather than checked again by every download
+        if not discardDownload:
+            os.makedirs("downloads", exist_ok=True)
+
+        # the request body is the same for every export, so it is encoded only once
+        exportRequestBody = json.dumps(exportRequest).encode("utf-8")
+
+        # each request has its own context:
+        contexts = [
+            ExportContext(
+                i + 1,
+                http,
+                backoff,
+                shutdown,
+                startBucket,
+                tokenProvider,
+                workspaceId,
+                reportId,
+                host,
+                exportRequest,
+                exportRequestBody,
+                discardDownload,
+                args.failFast,
+            )
+            for i in range(numExports)
+        ]
+
+        if numExports == 1:
+            # a single export does not need a thread pool
+            fullExport(contexts[0])
+            return
+
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="export") as executor:
+            try:
+                if args.startAllFirst:
+                    # start every export first, then pump the poll and download of the started ones into the queue
+                    exportIds = list(executor.map(startExport, contexts))
+                    futures = {
+                        executor.submit(finishExport, context, exportId): context
+                        for context, exportId in zip(contexts, exportIds)
+                        if exportId
+                    }
+                else:
+                    # pump all requests into the thread pool queue
+                    futures = {executor.submit(fullExport, context): context for context in contexts}
+
+                # wait for all futures to complete, so that an export failing early does not hide the others
+                errors = []
+                pending = set(futures)
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        try:
+                            future.result()
+                        except Exception as e:
+                            futures[future].trace(f"An error occurred: {e}")
+                            errors.append(e)
+
+                    if shutdown.is_set():
+                        # --failFast: drop the exports still queued, a cancelled future would never complete
+                        executor.shutdown(wait=False, cancel_futures=True)
+                        pending = {future for future in pending if not future.cancelled()}
+
+                if errors:
+                    raise errors[0]
+            except KeyboardInterrupt:
+                # the pool waits for the running exports on exit, so cut their sleeps short and drop the queued ones
+                shutdown.set()
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
+    finally:
+        if args.httpDebug:
+            logPoolStats()
+
+        # print the trace messages still in the queue
+        stopTraceListener(traceListener)
 
 
 if __name__ == "__main__":